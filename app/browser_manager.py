@@ -0,0 +1,176 @@
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox'
+]
+
+# Externally managed Chromium to connect to over CDP, e.g.
+# http://localhost:9222, so several server workers share one browser
+# process. Unset launches a browser per worker
+CDP_URL = os.getenv("PW_CDP_URL")
+
+# One Playwright driver and Chromium process shared by all scrapes; each
+# scrape opens its own context and page on it
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock: Optional[asyncio.Lock] = None
+
+# Warm contexts kept per key (usually the site's origin) so cookies and consent
+# state survive between scrapes of the same site. The HTTP cache is reused too,
+# but only in contexts without a route handler: Playwright turns the cache off
+# once context.route() is set, as resource blocking does. The least recently
+# used are closed past MAX_CONTEXTS; any still in use by a scrape are retired
+# and closed when released
+MAX_CONTEXTS = int(os.getenv("PW_MAX_CONTEXTS", "64"))
+_contexts: "OrderedDict[Hashable, BrowserContext]" = OrderedDict()
+_context_users: Dict[BrowserContext, int] = {}
+_retired: Set[BrowserContext] = set()
+
+# Contexts in which a cookie banner or overlay was already dismissed, so later
+# scrapes of the site skip looking for one. Kept here rather than as a cookie,
+# which the site would see on every request
+_overlay_dismissed: Set[BrowserContext] = set()
+
+
+async def get_browser() -> Browser:
+    """Return the shared Chromium browser, launching it on first use"""
+    global _playwright, _browser, _loop, _lock
+    
+    # The driver belongs to the event loop that started it
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _playwright = None
+        _browser = None
+        _loop = loop
+        _lock = asyncio.Lock()
+        _forget_contexts()
+    
+    if _browser is not None and _browser.is_connected():
+        return _browser
+    
+    async with _lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _forget_contexts()
+            if CDP_URL:
+                logger.info("Connecting to Chromium at %s", CDP_URL)
+                _browser = await _playwright.chromium.connect_over_cdp(CDP_URL)
+            else:
+                logger.info("Launching shared Chromium browser")
+                _browser = await _playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+    
+    return _browser
+
+
+async def acquire_context(
+    key: Hashable,
+    create: Callable[[Browser], Awaitable[BrowserContext]]
+) -> BrowserContext:
+    """
+    Return the warm context for key, creating it with create(browser) if needed
+    Every acquired context must be handed back with release_context()
+    """
+    context = _contexts.get(key)
+    if context is None:
+        context = await create(await get_browser())
+        
+        # Another scrape of the same key may have won the race
+        existing = _contexts.get(key)
+        if existing is not None:
+            await _close_context(context)
+            context = existing
+        else:
+            _contexts[key] = context
+            context.on("close", lambda _: _drop_context(key, context))
+    
+    _contexts.move_to_end(key)
+    _context_users[context] = _context_users.get(context, 0) + 1
+    
+    while len(_contexts) > MAX_CONTEXTS:
+        _, oldest = _contexts.popitem(last=False)
+        if _context_users.get(oldest):
+            _retired.add(oldest)
+        else:
+            await _close_context(oldest)
+    
+    return context
+
+
+async def release_context(context: BrowserContext):
+    """Hand back a context from acquire_context(), closing it if it was retired"""
+    users = _context_users.pop(context, 1) - 1
+    if users > 0:
+        _context_users[context] = users
+    elif context in _retired:
+        _retired.discard(context)
+        await _close_context(context)
+
+
+def overlay_dismissed(context: BrowserContext) -> bool:
+    """Whether an overlay was already dismissed in context"""
+    return context in _overlay_dismissed
+
+
+def mark_overlay_dismissed(context: BrowserContext):
+    """Remember that an overlay was dismissed in context"""
+    _overlay_dismissed.add(context)
+
+
+def _drop_context(key: Hashable, context: BrowserContext):
+    """Forget a context that closed, e.g. because the browser went away"""
+    if _contexts.get(key) is context:
+        del _contexts[key]
+    _retired.discard(context)
+    _overlay_dismissed.discard(context)
+
+
+def _forget_contexts():
+    """Forget all warm contexts; they died with the previous browser"""
+    _contexts.clear()
+    _context_users.clear()
+    _retired.clear()
+    _overlay_dismissed.clear()
+
+
+async def _close_context(context: BrowserContext):
+    _overlay_dismissed.discard(context)
+    try:
+        await context.close()
+    except Exception as e:
+        logger.warning("Failed to close browser context: %s", e)
+
+
+async def close_browser():
+    """
+    Close the shared browser and stop the Playwright driver
+    A browser connected over CDP is only disconnected from, not shut down
+    """
+    global _playwright, _browser
+    
+    _forget_contexts()
+    
+    try:
+        if _browser:
+            await _browser.close()
+    except Exception as e:
+        logger.warning("Failed to close browser: %s", e)
+    
+    try:
+        if _playwright:
+            await _playwright.stop()
+    except Exception as e:
+        logger.warning("Failed to stop Playwright: %s", e)
+    
+    _browser = None
+    _playwright = None
@@ -1,11 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, field_validator
 
-# Initialize FastAPI app
-app = FastAPI(title="Universal Website Scraper")
+from app.browser_manager import close_browser
+from app.scraper import close_http_client, scrape_website
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the scraper's shared HTTP client and browser on shutdown"""
+    yield
+    await close_http_client()
+    await close_browser()
+
+# Initialize FastAPI app; orjson encodes the large scrape results much faster
+app = FastAPI(
+    title="Universal Website Scraper",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Add validation error handler
 @app.exception_handler(RequestValidationError)
@@ -28,6 +45,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 # Setup templates
 templates = Jinja2Templates(directory="app/template")
 
+# Schemes accepted by ScrapeRequest
+URL_SCHEMES = ('http://', 'https://')
+
 # Request model
 class ScrapeRequest(BaseModel):
     url: str
@@ -37,7 +57,7 @@ class ScrapeRequest(BaseModel):
     def validate_url(cls, v):
         # Strip whitespace
         v = v.strip()
-        if not v.startswith(('http://', 'https://')):
+        if not v.startswith(URL_SCHEMES):
             raise ValueError('URL must start with http:// or https://')
         return v
 
@@ -60,13 +80,12 @@ async def scrape_url(request: ScrapeRequest):
     Scrape a website and return structured JSON
     """
     try:
-        # Import scraper
-        from app.scraper import scrape_website
-        
         # Perform scraping
         result = await scrape_website(request.url)
         
-        return {"result": result}
+        # orjson encodes the Link/Image dataclasses directly, so skip
+        # FastAPI's jsonable_encoder pass over the whole result
+        return ORJSONResponse({"result": result})
         
     except ValueError as e:
         return JSONResponse(
@@ -80,11 +99,13 @@ async def scrape_url(request: ScrapeRequest):
         )
 
 # Optional: Add CORS if needed
-from fastapi.middleware.cors import CORSMiddleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# Compress large JSON results for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
\ No newline at end of file
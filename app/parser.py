@@ -1,14 +1,206 @@
-from selectolax.parser import HTMLParser
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import urljoin
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+_HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+_LIST_TAGS = frozenset({"ul", "ol"})
+_LANDMARK_TAGS = frozenset({"header", "nav", "main", "section", "article", "aside", "footer"})
+
+# Selectors used on every parse, hoisted so each call reuses the same string
+_MAIN_SEL = "main, [role='main']"
+_SUBSECTION_SEL = "section, article, div[class*='section']"
+_LIST_SEL = "ul, ol"
+
+# Turns id separators into spaces when an id is used as a section label
+_LABEL_TABLE = str.maketrans({"-": " ", "_": " "})
+
+# Tags read by extract_meta, keyed as in _scan_head; _collect_head_tags
+# matches them without the CSS engine
+_HEAD_TAG_SELECTORS = {
+    "title": "title",
+    "og:title": 'meta[property="og:title"]',
+    "description": 'meta[name="description"]',
+    "og:description": 'meta[property="og:description"]',
+    "canonical": 'link[rel="canonical"]'
+}
+
+_RAW_HTML_LIMIT = 5000
+# Subtrees up to this many nodes are serialized in one Node.html call
+_RAW_HTML_SMALL_NODES = 64
+
+# Serialized whole by _raw_html_bounded: raw-text and foreign (SVG/MathML)
+# content does not round-trip through Node.attributes and text nodes
+_OPAQUE_TAGS = frozenset({
+    "script", "style", "textarea", "title", "xmp", "iframe", "noembed",
+    "noframes", "noscript", "plaintext", "template", "svg", "math"
+})
+
+
+@dataclass(slots=True)
+class Link:
+    """A link found in a section; serializes as {"text", "href"}"""
+    text: str
+    href: str
+
+
+@dataclass(slots=True)
+class Image:
+    """An image found in a section; serializes as {"src", "alt"}"""
+    src: str
+    alt: str
+
+
+@lru_cache(maxsize=4096)
+def _absolute_url(base_url: str, url: str) -> str:
+    """Resolve url against base_url; cached since hrefs repeat within a page"""
+    return urljoin(base_url, url)
+
+
+@lru_cache(maxsize=1024)
+def _type_from_attrs(tag: str, classes: str, id_attr: str) -> Optional[str]:
+    """
+    Map a section's tag, class and id to its type, or None if they do not
+    decide it. Cached since sections on a page often repeat class strings
+    """
+    tag = tag.lower()
+    classes = classes.lower()
+    id_attr = id_attr.lower()
+    # Class and id are searched together for most keywords
+    haystack = f"{classes} {id_attr}"
+    
+    # Check by tag
+    if tag == "header":
+        return "hero" if "hero" in classes else "section"
+    if tag == "nav":
+        return "nav"
+    if tag == "footer":
+        return "footer"
+    
+    # Check by class/id
+    if "hero" in haystack or "banner" in haystack or "jumbotron" in haystack:
+        return "hero"
+    if "pricing" in haystack or "plans" in haystack:
+        return "pricing"
+    if "faq" in haystack or "questions" in haystack:
+        return "faq"
+    if "grid" in classes or "cards" in classes:
+        return "grid"
+    if "nav" in haystack or "menu" in haystack:
+        return "nav"
+    
+    return None
+
+
+def _subtree_end(node, root) -> Optional[int]:
+    """
+    Return the mem_id of the first node Node.traverse() yields after node's
+    subtree, or None if the subtree runs to the end of root
+    """
+    root_id = root.mem_id
+    while node.mem_id != root_id:
+        following = node.next
+        # traverse() skips text nodes, so they cannot mark the end
+        while following is not None and following.tag == "-text":
+            following = following.next
+        if following is not None:
+            return following.mem_id
+        node = node.parent
+    return None
+
+
+def _pop_finished(stack: list, node_id: int) -> None:
+    """Drop the open entries whose subtree ends right before node_id"""
+    while stack and stack[-1][0] == node_id:
+        stack.pop()
+
+
+def _opening_tag(node) -> str:
+    """Serialize the start tag of node the way Lexbor does"""
+    attrs = []
+    for name, value in node.attributes.items():
+        if value is None:
+            attrs.append(f" {name}")
+        else:
+            value = value.replace("&", "&amp;").replace("\xa0", "&nbsp;").replace('"', "&quot;")
+            attrs.append(f' {name}="{value}"')
+    return f"<{node.tag}{''.join(attrs)}>"
+
+
+def _is_small_subtree(node) -> bool:
+    """Check whether node's subtree has at most _RAW_HTML_SMALL_NODES nodes"""
+    for count, _ in enumerate(node.traverse(include_text=True)):
+        if count >= _RAW_HTML_SMALL_NODES:
+            return False
+    return True
+
+
+def _raw_html_bounded(element, limit: int = _RAW_HTML_LIMIT):
+    """
+    Serialize element, stopping once more than limit characters are out
+    Returns (html, truncated), same as slicing element.html, but without
+    building the whole subtree as one string first
+    """
+    parts = []
+    size = 0
+    # Open elements as (iterator over their remaining children, closing tag)
+    stack = []
+    node = element
+    while size <= limit:
+        if node is not None:
+            if node.child is None or node.tag in _OPAQUE_TAGS or _is_small_subtree(node):
+                chunk = node.html
+            else:
+                chunk = _opening_tag(node)
+                stack.append((node.iter(include_text=True), f"</{node.tag}>"))
+        elif stack:
+            children, closing = stack[-1]
+            node = next(children, None)
+            if node is not None:
+                continue
+            stack.pop()
+            chunk = closing
+        else:
+            break
+        parts.append(chunk)
+        size += len(chunk)
+        node = None
+    
+    html = "".join(parts)
+    if size > limit:
+        return html[:limit] + "...", True
+    return html, False
+
+
+def _collect_head_tags(nodes, tags: Dict[str, Any]) -> None:
+    """
+    Add the first title/meta/link tag of each kind among nodes to tags, with
+    the same matching as _HEAD_TAG_SELECTORS; kinds already in tags are kept
+    """
+    for node in nodes:
+        tag = node.tag
+        if tag == "title":
+            tags.setdefault("title", node)
+        elif tag == "meta":
+            attrs = node.attributes
+            if attrs.get("name") == "description":
+                tags.setdefault("description", node)
+            prop = attrs.get("property")
+            if prop == "og:title" or prop == "og:description":
+                tags.setdefault(prop, node)
+        elif tag == "link":
+            if node.attributes.get("rel") == "canonical":
+                tags.setdefault("canonical", node)
 
 
 class HTMLContentParser:
     """
     Parses HTML content and extracts structured data
+    html may be str or UTF-8 encoded bytes, which are parsed as-is
     """
     
-    def __init__(self, html: str, base_url: str):
+    def __init__(self, html: Union[str, bytes], base_url: str):
         self.parser = HTMLParser(html)
         self.base_url = base_url
         self.section_counter = 0
@@ -22,51 +214,85 @@ class HTMLContentParser:
             "canonical": None
         }
         
+        # Collect title/meta/link tags from <head> in one walk
+        head_tags = self._scan_head()
+        
         # Extract title
-        title_tag = self.parser.css_first("title")
+        title_tag = self._find_head_tag(head_tags, "title")
         if title_tag:
             meta["title"] = title_tag.text(strip=True)
         
         # Try og:title as fallback
         if not meta["title"]:
-            og_title = self.parser.css_first('meta[property="og:title"]')
+            og_title = self._find_head_tag(head_tags, "og:title")
             if og_title:
                 meta["title"] = og_title.attributes.get("content", "")
         
         # Extract description
-        desc_tag = self.parser.css_first('meta[name="description"]')
+        desc_tag = self._find_head_tag(head_tags, "description")
         if desc_tag:
             meta["description"] = desc_tag.attributes.get("content", "")
         
         # Try og:description as fallback
         if not meta["description"]:
-            og_desc = self.parser.css_first('meta[property="og:description"]')
+            og_desc = self._find_head_tag(head_tags, "og:description")
             if og_desc:
                 meta["description"] = og_desc.attributes.get("content", "")
         
         # Extract language
-        html_tag = self.parser.css_first("html")
-        if html_tag and html_tag.attributes.get("lang"):
-            meta["language"] = html_tag.attributes.get("lang", "en")
+        html_tag = self.parser.root
+        if html_tag:
+            lang = html_tag.attributes.get("lang")
+            if lang:
+                meta["language"] = lang
         
         # Extract canonical URL
-        canonical_tag = self.parser.css_first('link[rel="canonical"]')
+        canonical_tag = self._find_head_tag(head_tags, "canonical")
         if canonical_tag:
             meta["canonical"] = canonical_tag.attributes.get("href")
         
         return meta
     
+    def _scan_head(self) -> Dict[str, Any]:
+        """Collect the first title/meta/link tag of each kind found in <head>"""
+        tags = {}
+        head = self.parser.head
+        if head is not None:
+            _collect_head_tags(head.traverse(), tags)
+        return tags
+    
+    def _find_head_tag(self, head_tags: Dict[str, Any], key: str):
+        """
+        Return the tag collected by _scan_head. The first miss walks the rest
+        of the document once for every kind still missing, in case they are
+        misplaced outside <head>; kinds found nowhere are then stored as None
+        """
+        if key not in head_tags:
+            head = self.parser.head
+            root = self.parser.root
+            if root is not None:
+                for child in root.iter():
+                    if head is None or child.mem_id != head.mem_id:
+                        _collect_head_tags(child.traverse(), head_tags)
+            for missing in _HEAD_TAG_SELECTORS:
+                head_tags.setdefault(missing, None)
+        return head_tags[key]
+    
+    def extract_meta_and_sections(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Extract metadata and sections in one call"""
+        return self.extract_meta(), self.extract_sections()
+    
     def extract_sections(self) -> List[Dict[str, Any]]:
         """Group content into sections"""
         sections = []
         
         # Try to find main content area
-        main = self.parser.css_first("main, [role='main']")
+        main = self.parser.css_first(_MAIN_SEL)
         if main:
             sections.extend(self._parse_element_sections(main))
         else:
             # Parse body sections
-            body = self.parser.css_first("body")
+            body = self.parser.body
             if body:
                 sections.extend(self._parse_body_sections(body))
         
@@ -80,12 +306,12 @@ class HTMLContentParser:
         """Parse sections from body element"""
         sections = []
         
-        # Find landmark elements
-        landmarks = body.css("header, nav, main, section, article, aside, footer")
+        # Find landmark elements by tag, without going through the CSS engine
+        landmarks = [node for node in body.traverse() if node.tag in _LANDMARK_TAGS]
         
         for element in landmarks:
-            section = self._parse_section(element)
-            if section and self._has_content(section):
+            section = self._parse_section(element, require_content=True)
+            if section:
                 sections.append(section)
         
         return sections
@@ -94,41 +320,44 @@ class HTMLContentParser:
         """Parse sections from a specific element"""
         sections = []
         
-        # Find sections and articles
-        subsections = element.css("section, article, div[class*='section']")
+        # Find sections and articles, in document order. (The earlier Modest
+        # backend grouped matches by selector, all sections before articles;
+        # Lexbor also leaves <template> content out of section text)
+        subsections = element.css(_SUBSECTION_SEL)
         
         if subsections:
             for subsection in subsections:
-                section = self._parse_section(subsection)
-                if section and self._has_content(section):
+                section = self._parse_section(subsection, require_content=True)
+                if section:
                     sections.append(section)
         else:
             # Parse the element itself as a section
-            section = self._parse_section(element)
-            if section and self._has_content(section):
+            section = self._parse_section(element, require_content=True)
+            if section:
                 sections.append(section)
         
         return sections
     
-    def _parse_section(self, element) -> Optional[Dict[str, Any]]:
-        """Parse a single section element"""
+    def _parse_section(self, element, require_content: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Parse a single section element
+        With require_content, returns None for sections without meaningful content
+        """
         self.section_counter += 1
         
+        # Extract content
+        content, has_content = self._extract_content(element)
+        if require_content and not has_content:
+            return None
+        
         # Determine section type
         section_type = self._determine_section_type(element)
         
-        # Extract content
-        content = self._extract_content(element)
-        
         # Generate label
         label = self._generate_label(element, content)
         
         # Get raw HTML (truncated)
-        raw_html = element.html
-        truncated = False
-        if len(raw_html) > 5000:
-            raw_html = raw_html[:5000] + "..."
-            truncated = True
+        raw_html, truncated = _raw_html_bounded(element)
         
         return {
             "id": f"{section_type}-{self.section_counter}",
@@ -142,38 +371,26 @@ class HTMLContentParser:
     
     def _determine_section_type(self, element) -> str:
         """Determine the type of section"""
-        tag = element.tag.lower()
-        classes = element.attributes.get("class", "").lower()
-        id_attr = element.attributes.get("id", "").lower()
-        
-        # Check by tag
-        if tag == "header":
-            return "hero" if "hero" in classes else "section"
-        if tag == "nav":
-            return "nav"
-        if tag == "footer":
-            return "footer"
-        
-        # Check by class/id
-        if any(keyword in classes or keyword in id_attr for keyword in ["hero", "banner", "jumbotron"]):
-            return "hero"
-        if any(keyword in classes or keyword in id_attr for keyword in ["pricing", "plans"]):
-            return "pricing"
-        if any(keyword in classes or keyword in id_attr for keyword in ["faq", "questions"]):
-            return "faq"
-        if "grid" in classes or "cards" in classes:
-            return "grid"
-        if any(keyword in classes or keyword in id_attr for keyword in ["nav", "menu"]):
-            return "nav"
+        attrs = element.attributes
+        section_type = _type_from_attrs(
+            element.tag,
+            attrs.get("class") or "",
+            attrs.get("id") or ""
+        )
+        if section_type:
+            return section_type
         
         # Check for lists
-        if element.css("ul, ol"):
+        if element.css_first(_LIST_SEL) is not None:
             return "list"
         
         return "section"
     
-    def _extract_content(self, element) -> Dict[str, Any]:
-        """Extract structured content from element"""
+    def _extract_content(self, element) -> Tuple[Dict[str, Any], bool]:
+        """
+        Extract structured content from element
+        Also returns whether the content is meaningful enough to keep
+        """
         content = {
             "headings": [],
             "text": "",
@@ -183,59 +400,120 @@ class HTMLContentParser:
             "tables": []
         }
         
-        # Extract headings
-        for heading in element.css("h1, h2, h3, h4, h5, h6"):
+        headings = []
+        links = []
+        removed = []
+        # Lists hold indexes into list_items, table rows indexes into cells
+        lists = []
+        list_items = []
+        tables = []
+        cells = []
+        
+        # Lists, tables and rows we are inside, as
+        # (id of the first node after the subtree, collected indexes/rows)
+        open_lists = []
+        open_tables = []
+        open_rows = []
+        
+        # Single depth-first walk; text is read afterwards so that it
+        # excludes the script/style nodes found along the way
+        for node in element.traverse():
+            tag = node.tag
+            
+            if open_lists or open_tables or open_rows:
+                node_id = node.mem_id
+                _pop_finished(open_lists, node_id)
+                _pop_finished(open_tables, node_id)
+                _pop_finished(open_rows, node_id)
+            
+            if tag in _HEADING_TAGS:
+                headings.append(node)
+            
+            elif tag == "a":
+                href = node.attributes.get("href")
+                if href and not href.startswith("#"):
+                    links.append((node, href))
+            
+            elif tag == "img":
+                attrs = node.attributes
+                src = attrs.get("src")
+                if src:
+                    content["images"].append(Image(
+                        src=self._make_absolute_url(src),
+                        alt=attrs.get("alt", "")
+                    ))
+            
+            elif tag == "script" or tag == "style":
+                removed.append(node)
+            
+            elif tag in _LIST_TAGS:
+                items = []
+                lists.append(items)
+                open_lists.append((_subtree_end(node, element), items))
+            
+            elif tag == "li":
+                # Nested items also belong to every enclosing list
+                if open_lists:
+                    for _, items in open_lists:
+                        items.append(len(list_items))
+                    list_items.append(node)
+            
+            elif tag == "table":
+                rows = []
+                tables.append(rows)
+                open_tables.append((_subtree_end(node, element), rows))
+            
+            elif tag == "tr":
+                if open_tables:
+                    row = []
+                    for _, rows in open_tables:
+                        rows.append(row)
+                    open_rows.append((_subtree_end(node, element), row))
+            
+            elif tag == "td" or tag == "th":
+                if open_rows:
+                    for _, row in open_rows:
+                        row.append(len(cells))
+                    cells.append(node)
+        
+        # Everything below is read with script/style removed. That includes
+        # heading text, which the original parser read before removing them
+        for node in removed:
+            node.decompose()
+        
+        text = element.text(strip=True)
+        content["text"] = text[:2000]
+        
+        for heading in headings:
             text = heading.text(strip=True)
             if text:
                 content["headings"].append(text)
         
-        # Extract text (remove script/style content)
-        for script in element.css("script, style"):
-            script.decompose()
+        for link, href in links:
+            content["links"].append(Link(
+                text=link.text(strip=True),
+                href=self._make_absolute_url(href)
+            ))
         
-        text = element.text(strip=True)
-        content["text"] = text[:2000] if len(text) > 2000 else text
-        
-        # Extract links
-        for link in element.css("a[href]"):
-            href = link.attributes.get("href", "")
-            if href and not href.startswith("#"):
-                content["links"].append({
-                    "text": link.text(strip=True),
-                    "href": self._make_absolute_url(href)
-                })
-        
-        # Extract images
-        for img in element.css("img[src]"):
-            src = img.attributes.get("src", "")
-            if src:
-                content["images"].append({
-                    "src": self._make_absolute_url(src),
-                    "alt": img.attributes.get("alt", "")
-                })
-        
-        # Extract lists
-        for ul in element.css("ul, ol"):
-            items = [li.text(strip=True) for li in ul.css("li")]
+        # Each item and cell is read once, even when lists or tables nest
+        item_texts = [li.text(strip=True) for li in list_items]
+        for items in lists:
             if items:
-                content["lists"].append(items)
+                content["lists"].append([item_texts[i] for i in items])
         
-        # Extract tables
-        for table in element.css("table"):
-            table_data = self._parse_table(table)
+        cell_texts = [cell.text(strip=True) for cell in cells]
+        for rows in tables:
+            table_data = [[cell_texts[i] for i in row] for row in rows if row]
             if table_data:
                 content["tables"].append(table_data)
         
-        return content
-    
-    def _parse_table(self, table) -> List[List[str]]:
-        """Parse table into 2D array"""
-        rows = []
-        for tr in table.css("tr"):
-            cells = [td.text(strip=True) for td in tr.css("td, th")]
-            if cells:
-                rows.append(cells)
-        return rows
+        has_content = bool(
+            content["headings"] or
+            len(content["text"]) > 20 or
+            content["links"] or
+            content["images"]
+        )
+        return content, has_content
     
     def _generate_label(self, element, content: Dict[str, Any]) -> str:
         """Generate a label for the section"""
@@ -246,7 +524,7 @@ class HTMLContentParser:
         # Try to use id or class
         id_attr = element.attributes.get("id", "")
         if id_attr:
-            return id_attr.replace("-", " ").replace("_", " ").title()[:50]
+            return id_attr.translate(_LABEL_TABLE).title()[:50]
         
         # Use first few words of text
         text = content["text"]
@@ -260,21 +538,11 @@ class HTMLContentParser:
         """Convert relative URLs to absolute"""
         if url.startswith(("http://", "https://")):
             return url
-        return urljoin(self.base_url, url)
-    
-    def _has_content(self, section: Dict[str, Any]) -> bool:
-        """Check if section has meaningful content"""
-        content = section.get("content", {})
-        return bool(
-            content.get("headings") or
-            len(content.get("text", "")) > 20 or
-            content.get("links") or
-            content.get("images")
-        )
+        return _absolute_url(self.base_url, url)
     
     def _create_fallback_section(self) -> Dict[str, Any]:
         """Create a fallback section when no sections found"""
-        body = self.parser.css_first("body")
+        body = self.parser.body
         if body:
             return self._parse_section(body)
         
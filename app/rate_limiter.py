@@ -0,0 +1,76 @@
+from cachetools import LRUCache
+from typing import Dict
+from urllib.parse import urlparse
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Requests per second allowed to each host, with per-host overrides given as
+# HOST_RPS_OVERRIDES="example.com=2,api.example.org=10". 0 means no limit
+HOST_RPS = float(os.getenv("HOST_RPS", "5"))
+
+
+def _parse_overrides(value: str) -> Dict[str, float]:
+    """Parse "host=rps,host=rps" into a dict, skipping malformed entries"""
+    overrides = {}
+    for entry in filter(None, (entry.strip() for entry in value.split(","))):
+        host, _, rps = entry.partition("=")
+        try:
+            overrides[host.strip().lower()] = float(rps)
+        except ValueError:
+            logger.warning("Ignoring malformed HOST_RPS_OVERRIDES entry: %s", entry)
+    return overrides
+
+
+HOST_RPS_OVERRIDES = _parse_overrides(os.getenv("HOST_RPS_OVERRIDES", ""))
+
+
+class HostLimiter:
+    """Token bucket allowing rps requests per second, in bursts of up to rps"""
+    
+    def __init__(self, rps: float):
+        self.rps = rps
+        self.capacity = max(1.0, rps)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _reserve(self) -> float:
+        """Take a token, returning how long to wait until it is actually free"""
+        if self.rps <= 0:
+            return 0.0
+        
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rps)
+        self.updated = now
+        
+        # Tokens go negative while callers are queued; each waits its turn
+        self.tokens -= 1
+        return -self.tokens / self.rps if self.tokens < 0 else 0.0
+    
+    async def acquire(self):
+        """Wait until a request to this host is allowed"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Limiters by host. An idle limiter has a full bucket, the same as a new one,
+# so dropping the least recently used ones loses nothing
+_limiters: "LRUCache[str, HostLimiter]" = LRUCache(maxsize=4096)
+
+
+def get_limiter(url: str) -> HostLimiter:
+    """Return the rate limiter for url's host"""
+    host = (urlparse(url).hostname or "").lower()
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = HostLimiter(HOST_RPS_OVERRIDES.get(host, HOST_RPS))
+    return limiter
+
+
+async def wait_for_host(url: str):
+    """Wait for url's host's rate limit before sending a request to it"""
+    await get_limiter(url).acquire()
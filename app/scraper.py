@@ -1,15 +1,369 @@
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from playwright.async_api import TimeoutError as PlaywrightTimeout
 import httpx
+from app.browser_manager import (
+    acquire_context,
+    mark_overlay_dismissed,
+    overlay_dismissed,
+    release_context
+)
 from app.parser import HTMLContentParser
+from app.rate_limiter import wait_for_host
+from cachetools import TTLCache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+import os
+import random
+import re
 
 logger = logging.getLogger(__name__)
 
-async def scrape_website(url: str) -> dict:
+# Pages larger than this are parsed in a worker process instead of a thread,
+# so a long parse does not hold the GIL against the event loop. Below it the
+# cost of shipping the page and its sections between processes outweighs that
+LARGE_HTML_CHARS = int(os.getenv("PARSE_PROCESS_MIN_CHARS", "250000"))
+
+# Concurrency caps: each Playwright scrape holds a browser context (the memory
+# bound), while static fetches are cheap but shouldn't flood target sites
+PW_CONCURRENCY = int(os.getenv("PW_CONCURRENCY", "20"))
+HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", "200"))
+_PW_SEM = asyncio.Semaphore(PW_CONCURRENCY)
+_HTTP_SEM = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+# Resource types never needed for text extraction; the HTML still carries
+# image URLs and og:image, so blocking them loses no output.
+# PW_BLOCK_RESOURCES=0 loads everything, and keeps the HTTP cache that the
+# blocking route disables
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+BLOCK_RESOURCES = os.getenv("PW_BLOCK_RESOURCES", "1") != "0"
+
+# Static pages are read up to this many bytes; the rest is dropped
+MAX_HTML_BYTES = int(os.getenv("MAX_HTML_BYTES", str(5 * 1024 * 1024)))
+
+# Static fetches are retried on errors that are usually transient (timeouts,
+# dropped connections, 5xx), which is far cheaper than a Playwright fallback.
+# 4xx responses are not retried
+STATIC_FETCH_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 2.0
+TRANSIENT_FETCH_ERRORS = (
+    httpx.ConnectTimeout,
+    httpx.ReadTimeout,
+    httpx.RemoteProtocolError
+)
+
+# Connection pool for static fetches; kept-alive connections skip the
+# TCP/TLS handshake on repeat hosts
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0
+)
+
+# Shared static-fetch client, created on first use by get_http_client(),
+# and the event loop its pooled connections belong to
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Parsed static pages by URL, so a repeat scrape of an unchanged page skips
+# the parse. Entries hold the page's ETag and body digest alongside the result.
+# They outlive _result_cache entries, which are written just after them, so
+# a scrape after the result expires revalidates instead of refetching
+_static_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Finished scrape results by URL, and the scrapes currently running
+_result_cache = TTLCache(maxsize=1024, ttl=300)
+_inflight: Dict[str, "asyncio.Future[dict]"] = {}
+
+# Markup removed when measuring a static page's text, in three passes like
+# re.sub with <script[^>]*>.*?</script>, then <style[^>]*>.*?</style>, then
+# <[^>]+>. Scanned with forward-only searches, since those regexes backtrack
+# to the end of the page for every unclosed <script or stray <
+_BLOCK_RE = {
+    tag: (
+        re.compile(f'<{tag}', re.IGNORECASE),
+        re.compile(f'</{tag}>', re.IGNORECASE)
+    )
+    for tag in ("script", "style")
+}
+
+# Common JS framework indicators, lowercase as they are matched against the
+# lowercased page
+JS_FRAMEWORK_MARKERS = tuple(marker.lower() for marker in (
+    'react',
+    'vue',
+    'angular',
+    'next.js',
+    '__NEXT_DATA__',
+    'ng-app',
+    'data-reactroot'
+))
+
+# Everything is_content_sufficient() looks for in the page
+CONTENT_MARKERS = JS_FRAMEWORK_MARKERS + (
+    '<main',
+    '<article',
+    '<div id="root"',
+    '<div id="app"'
+)
+
+# Static pages with no more visible text than this are rendered with Playwright
+MIN_STATIC_TEXT_CHARS = 500
+
+_parse_threads = ThreadPoolExecutor(max_workers=os.cpu_count())
+_parse_processes = None
+
+# Builds a querySelectorAll over the document and every open shadow root
+# under it, matching Playwright's CSS engine, which pierces open shadow DOM.
+# The roots are collected once per probe call and reused for each selector
+_QUERY_ALL_JS = """
+() => {
+    const roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+        for (const el of roots[i].querySelectorAll('*')) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+        }
+    }
+    return (selector) => roots.flatMap((root) => [...root.querySelectorAll(selector)]);
+}
+"""
+
+# In-page selector probe: finds the first selector whose first match is
+# visible and tags that element with data-scrape-hit, so one evaluate call
+# replaces a count/is_visible round-trip per selector. Playwright's
+# :has-text("...") is emulated as a case-insensitive text match
+_FIRST_VISIBLE_JS = f"""
+(selectors) => {{
+    const queryAll = ({_QUERY_ALL_JS})();
+    const visible = (el) => {{
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0
+            && getComputedStyle(el).visibility !== 'hidden';
+    }};
+    const firstMatch = (selector) => {{
+        const m = selector.match(/^(.*):has-text\\("(.*)"\\)$/);
+        if (!m) return queryAll(selector)[0] || null;
+        const needle = m[2].toLowerCase();
+        for (const el of queryAll(m[1] || '*')) {{
+            const text = el.textContent.replace(/\\s+/g, ' ').toLowerCase();
+            if (text.includes(needle)) return el;
+        }}
+        return null;
+    }};
+    queryAll('[data-scrape-hit]')
+        .forEach((el) => el.removeAttribute('data-scrape-hit'));
+    for (const selector of selectors) {{
+        let el = null;
+        try {{ el = firstMatch(selector); }} catch (e) {{ continue; }}
+        if (el && visible(el)) {{
+            el.setAttribute('data-scrape-hit', '');
+            return selector;
+        }}
+    }}
+    return null;
+}}
+"""
+
+# Returns the first selector matching more than one element, with its count
+_FIRST_MULTI_JS = f"""
+(selectors) => {{
+    const queryAll = ({_QUERY_ALL_JS})();
+    for (const selector of selectors) {{
+        const count = queryAll(selector).length;
+        if (count > 1) return [selector, count];
+    }}
+    return null;
+}}
+"""
+
+SCRAPE_HIT = '[data-scrape-hit]'
+
+# Runs the probe over pagination selectors and returns [selector, href], with
+# href null unless the hit is a link to another page (then it is clicked)
+_NEXT_LINK_JS = f"""
+(selectors) => {{
+    const selector = ({_FIRST_VISIBLE_JS})(selectors);
+    if (!selector) return null;
+    const el = ({_QUERY_ALL_JS})()('{SCRAPE_HIT}')[0];
+    let href = typeof el.href === 'string' ? el.href : null;
+    if (href) {{
+        const target = new URL(href, location.href);
+        const here = new URL(location.href);
+        target.hash = '';
+        here.hash = '';
+        if (!/^https?:$/.test(target.protocol) || target.href === here.href) href = null;
+    }}
+    return [selector, href];
+}}
+"""
+
+
+# Counts nodes added anywhere in the document, installed before page scripts
+# run. Reading it is free, unlike innerText which forces a layout
+_MUTATION_COUNTER_JS = """
+window.__scrape_muts = 0;
+new MutationObserver((records) => {
+    for (const record of records) window.__scrape_muts += record.addedNodes.length;
+}).observe(document, {childList: true, subtree: true});
+"""
+
+# Page size markers (height, nodes added so far); content has loaded once
+# either grows
+_PAGE_SIZE_JS = "[document.body.scrollHeight, window.__scrape_muts || 0]"
+_SCROLL_TO_BOTTOM_JS = """
+() => {
+    const size = [document.body.scrollHeight, window.__scrape_muts || 0];
+    window.scrollTo(0, size[0]);
+    return size;
+}
+"""
+_PAGE_GREW_JS = """
+([height, mutations]) => document.body.scrollHeight > height
+    || (window.__scrape_muts || 0) > mutations
+"""
+
+
+async def click_first_visible(page, selectors: list, timeout: int = 2000) -> Optional[str]:
+    """Click the first visible match among selectors; returns the selector hit"""
+    selector = await page.evaluate(_FIRST_VISIBLE_JS, selectors)
+    if selector:
+        await page.locator(SCRAPE_HIT).first.click(timeout=timeout)
+    return selector
+
+
+async def wait_for_first_visible(page, selectors: list, timeout: int) -> Optional[str]:
+    """
+    Wait until one of selectors has a visible match, marking it for SCRAPE_HIT
+    Returns the selector, or None if nothing shows up within timeout ms
+    """
+    try:
+        handle = await page.wait_for_function(
+            _FIRST_VISIBLE_JS, arg=selectors, polling=100, timeout=timeout
+        )
+    except PlaywrightTimeout:
+        return None
+    return await handle.json_value()
+
+
+async def wait_for_growth(page, size: list, timeout: int) -> bool:
+    """Wait until the page grows past size (from _PAGE_SIZE_JS); False on timeout"""
+    try:
+        await page.wait_for_function(_PAGE_GREW_JS, arg=size, polling=100, timeout=timeout)
+    except PlaywrightTimeout:
+        return False
+    return True
+
+
+def _parse_html(html: Union[str, bytes], url: str):
+    """Parse HTML into (meta, sections); runs in a worker thread or process"""
+    return HTMLContentParser(html, url).extract_meta_and_sections()
+
+
+def create_parse_processes() -> ProcessPoolExecutor:
+    """
+    Create the parse process pool. Workers come from a fork server where
+    available (spawn elsewhere) rather than forking this threaded process
+    """
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context(method)
+    )
+
+
+async def parse_html(html: Union[str, bytes], url: str):
+    """Parse HTML off the event loop, returning (meta, sections)"""
+    global _parse_processes
+    
+    # A process only helps when there is another core to run it on
+    if len(html) > LARGE_HTML_CHARS and (os.cpu_count() or 1) > 1:
+        if _parse_processes is None:
+            _parse_processes = create_parse_processes()
+        executor = _parse_processes
+    else:
+        executor = _parse_threads
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_html, html, url)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client used for static fetches"""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=HTTP_LIMITS,
+        timeout=15.0,
+        follow_redirects=True,
+        headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        }
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared static-fetch client, creating it on first use"""
+    global _http_client, _http_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = create_http_client()
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared static-fetch client, e.g. on app shutdown"""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def scrape_website(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    no_cache: bool = False
+) -> dict:
     """
     Main scraping function that tries static first, then falls back to JS rendering
+    Uses the shared HTTP client unless one is passed in
+    Error-free results are cached by URL and shared between callers, so they
+    must not be mutated; pass no_cache=True to force a fresh scrape
     """
+    if not no_cache:
+        cached = _result_cache.get(url)
+        if cached is not None:
+            return cached
+    
+    # Concurrent scrapes of one URL share a single run, started by the first.
+    # Awaiting it through shield() means a caller that goes away (e.g. a
+    # dropped request) doesn't cancel the scrape for the others
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(_scrape_and_cache(url, client))
+        _inflight[url] = task
+        task.add_done_callback(lambda _: _inflight.pop(url, None))
+    
+    return await asyncio.shield(task)
+
+
+async def _scrape_and_cache(url: str, client: Optional[httpx.AsyncClient]) -> dict:
+    """Scrape url, caching the result if it has no errors"""
+    result = await _scrape_website(url, client)
+    if not result["errors"]:
+        _result_cache[url] = result
+    return result
+
+
+async def _scrape_website(url: str, client: Optional[httpx.AsyncClient]) -> dict:
+    """Scrape url without the result cache"""
     
     result = {
         "url": url,
@@ -25,20 +379,43 @@ async def scrape_website(url: str) -> dict:
     }
     
     # Try static scraping first
-    logger.info(f"Attempting static scrape for: {url}")
+    logger.info("Attempting static scrape for: %s", url)
     try:
-        html = await fetch_static(url)
+        cached = _static_cache.get(url)
+        html, etag, truncated, digest = await fetch_static(url, client, etag=cached["etag"] if cached else None)
+        
+        # A 304 means the cached parse, and whether it was cut, still holds
+        if html is None:
+            truncated = cached["truncated"]
+        if truncated:
+            logger.warning("Static page exceeds %s bytes, truncated", MAX_HTML_BYTES)
+            result["errors"].append({
+                "message": f"Page is larger than {MAX_HTML_BYTES} bytes; only the first {MAX_HTML_BYTES} bytes were parsed.",
+                "phase": "static_fetch"
+            })
+        
+        # Only sufficient static pages are cached, so a hit skips that check too
+        if cached and (html is None or cached["digest"] == digest):
+            logger.info("Static page unchanged, reusing cached parse")
+            result["meta"], result["sections"] = cached["meta"], cached["sections"]
+            _static_cache[url] = cached  # Revalidated, so keep it for another TTL
+            return result
         
         if is_content_sufficient(html):
             logger.info("Static content appears sufficient")
-            parser = HTMLContentParser(html, url)
-            result["meta"] = parser.extract_meta()
-            result["sections"] = parser.extract_sections()
+            result["meta"], result["sections"] = await parse_html(html, url)
+            _static_cache[url] = {
+                "etag": etag,
+                "digest": digest,
+                "truncated": truncated,
+                "meta": result["meta"],
+                "sections": result["sections"]
+            }
             return result
         else:
             logger.info("Static content insufficient, falling back to JS rendering")
     except Exception as e:
-        logger.warning(f"Static scrape failed: {e}")
+        logger.warning("Static scrape failed: %s", e)
         result["errors"].append({
             "message": str(e),
             "phase": "static_fetch"
@@ -47,7 +424,11 @@ async def scrape_website(url: str) -> dict:
     # Fallback to Playwright for JS rendering
     try:
         logger.info("Starting Playwright scrape")
-        playwright_result = await scrape_with_playwright(url)
+        # Wait for the host's rate limit before taking a browser slot, so a
+        # throttled site doesn't hold one that other sites could use
+        await wait_for_host(url)
+        async with _PW_SEM:
+            playwright_result = await scrape_with_playwright(url)
         
         # Merge results
         result["meta"] = playwright_result.get("meta", {})
@@ -56,7 +437,7 @@ async def scrape_website(url: str) -> dict:
         result["errors"].extend(playwright_result.get("errors", []))
         
     except Exception as e:
-        logger.error(f"Playwright scrape failed: {e}", exc_info=True)
+        logger.error("Playwright scrape failed: %s", e, exc_info=True)
         result["errors"].append({
             "message": str(e),
             "phase": "js_render"
@@ -65,19 +446,39 @@ async def scrape_website(url: str) -> dict:
     return result
 
 
-async def fetch_static(url: str) -> str:
-    """Fetch HTML using httpx for static pages"""
+async def fetch_static(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    etag: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str], bool, Optional[bytes]]:
+    """
+    Fetch HTML using httpx for static pages
+    Returns (html, etag, truncated, digest); html is None when the page still
+    matches the given etag (304 Not Modified), and is cut at MAX_HTML_BYTES if
+    longer. digest is a hash of the body bytes read, None with html
+    """
+    if client is None:
+        client = get_http_client()
+    
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(
-                url,
-                timeout=15.0,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                }
-            )
-            response.raise_for_status()
-            return response.text
+        headers = {"If-None-Match": etag} if etag else None
+        for attempt in range(1, STATIC_FETCH_ATTEMPTS + 1):
+            try:
+                return await _fetch_static_once(url, client, headers, etag)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code < 500 or attempt == STATIC_FETCH_ATTEMPTS:
+                    raise
+                reason = f"HTTP {e.response.status_code}"
+            except TRANSIENT_FETCH_ERRORS as e:
+                if attempt == STATIC_FETCH_ATTEMPTS:
+                    raise
+                reason = type(e).__name__
+            
+            # Exponential backoff with jitter, so retries don't arrive together
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            logger.info("Static fetch failed (%s), retry %s in %.2fs", reason, attempt, delay)
+            await asyncio.sleep(delay)
     except httpx.HTTPStatusError as e:
         if e.response.status_code in [403, 401, 429]:
             raise Exception("Access denied. This site may be blocking automated access or requires authentication.")
@@ -88,51 +489,186 @@ async def fetch_static(url: str) -> str:
         raise Exception(f"Failed to fetch page: {str(e)}")
 
 
+async def _fetch_static_once(
+    url: str,
+    client: httpx.AsyncClient,
+    headers: Optional[dict],
+    etag: Optional[str]
+) -> Tuple[Optional[str], Optional[str], bool, Optional[bytes]]:
+    """Make a single fetch_static attempt"""
+    # Only the request itself holds an HTTP slot; the rate limit wait here and
+    # the retry backoff in fetch_static don't
+    await wait_for_host(url)
+    async with _HTTP_SEM, client.stream("GET", url, headers=headers) as response:
+        if etag and response.status_code == 304:
+            return None, etag, False, None
+        response.raise_for_status()
+        
+        # Read at most MAX_HTML_BYTES rather than buffering the whole body,
+        # hashing it as it arrives for the static cache's change check
+        chunks = []
+        size = 0
+        truncated = False
+        body_hash = hashlib.blake2b(digest_size=16)
+        async for chunk in response.aiter_bytes(65536):
+            if size + len(chunk) > MAX_HTML_BYTES:
+                chunk = chunk[:MAX_HTML_BYTES - size]
+                truncated = True
+            chunks.append(chunk)
+            body_hash.update(chunk)
+            size += len(chunk)
+            if truncated:
+                break
+        
+        html = b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+        return html, response.headers.get("ETag"), truncated, body_hash.digest()
+
+
 def is_content_sufficient(html: str) -> bool:
     """
     Heuristic to check if static HTML has enough content
     Returns False if we should use JS rendering
     """
-    # Check for common JS framework indicators
-    js_frameworks = [
-        'react',
-        'vue',
-        'angular',
-        'next.js',
-        '__NEXT_DATA__',
-        'ng-app',
-        'data-reactroot'
-    ]
-    
-    html_lower = html.lower()
+    found = find_markers(html, CONTENT_MARKERS)
     
     # If it's a JS-heavy framework, use Playwright
-    for framework in js_frameworks:
-        if framework in html_lower:
-            return False
+    if not found.isdisjoint(JS_FRAMEWORK_MARKERS):
+        return False
     
     # Check if there's minimal actual content
     # Look for main content indicators
-    if '<main' not in html_lower and '<article' not in html_lower:
+    if '<main' not in found and '<article' not in found:
         # Might be JS-rendered
-        if '<div id="root"' in html_lower or '<div id="app"' in html_lower:
+        if '<div id="root"' in found or '<div id="app"' in found:
             return False
     
     # Check text content length (rough heuristic)
-    # Remove scripts and styles
-    import re
-    text_only = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    text_only = re.sub(r'<style[^>]*>.*?</style>', '', text_only, flags=re.DOTALL | re.IGNORECASE)
-    text_only = re.sub(r'<[^>]+>', '', text_only)
-    
     # If there's enough text content, consider it sufficient
-    return len(text_only.strip()) > 500
+    return has_enough_text(html, MIN_STATIC_TEXT_CHARS)
+
 
+def find_markers(html: str, markers: Tuple[str, ...], window: int = 65536) -> set:
+    """
+    Return the lowercase markers found in html.lower(), lowering the page a
+    window at a time instead of copying all of it. Windows overlap by the
+    longest marker so none is missed at a boundary
+    """
+    overlap = max(len(marker) for marker in markers)
+    found = set()
+    
+    for start in range(0, max(len(html), 1), window):
+        chunk = html[start:start + window + overlap].lower()
+        found.update(marker for marker in markers if marker in chunk)
+        if len(found) == len(markers):
+            break
+    
+    return found
+
+
+def has_enough_text(html: str, minimum: int) -> bool:
+    """
+    Check whether the HTML's text, with scripts, styles and tags removed and
+    surrounding whitespace stripped, is longer than minimum characters
+    Stops scanning as soon as the threshold is passed
+    """
+    first = None  # Offset of the first non-whitespace text character
+    offset = 0
+    
+    for piece in _text_pieces(html):
+        if piece.strip():
+            if first is None:
+                first = offset + len(piece) - len(piece.lstrip())
+            if offset + len(piece.rstrip()) - first > minimum:
+                return True
+        offset += len(piece)
+    
+    return False
 
-async def scrape_with_playwright(url: str) -> dict:
+
+def _text_pieces(html: str):
+    """
+    Yield the text left after removing script blocks, then style blocks from
+    what remains, then tags, in order; see _BLOCK_RE
+    Runs in linear time: each search result is reused until the scan passes
+    it, and a search that found nothing is never repeated
+    """
+    html = _remove_blocks(_remove_blocks(html, "script"), "style")
+    
+    next_gt = None  # Position of the next '>', -1 if there are no more
+    start = 0
+    pos = 0
+    
+    while True:
+        lt = html.find("<", pos)
+        if lt < 0:
+            break
+        pos = lt + 1
+        
+        if next_gt is None or next_gt <= lt:
+            next_gt = html.find(">", lt + 1)
+            if next_gt < 0:
+                break  # No tag can close from here on
+        
+        if next_gt > lt + 1:
+            yield html[start:lt]
+            start = pos = next_gt + 1
+    
+    yield html[start:]
+
+
+def _remove_blocks(html: str, tag: str) -> str:
+    """Remove every <tag ...>...</tag> block from html, in one forward scan"""
+    opener, closer = _BLOCK_RE[tag]
+    kept = []
+    start = 0
+    
+    while True:
+        block = opener.search(html, start)
+        if block is None:
+            break
+        
+        # A later opener can only close at or after this one's '>' and
+        # closing tag, so once either is missing none can
+        gt = html.find(">", block.end())
+        if gt < 0:
+            break
+        close = closer.search(html, gt + 1)
+        if close is None:
+            break
+        
+        kept.append(html[start:block.start()])
+        start = close.end()
+    
+    kept.append(html[start:])
+    return "".join(kept)
+
+
+async def new_scrape_context(browser, block_resources: bool):
+    """Create a browser context configured for scraping"""
+    context = await browser.new_context(
+        viewport={"width": 1920, "height": 1080},
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        ignore_https_errors=True
+    )
+    
+    # Add extra headers
+    await context.set_extra_http_headers({
+        'Accept-Language': 'en-US,en;q=0.9',
+    })
+    
+    if block_resources:
+        await context.route("**/*", block_heavy_resources)
+    await context.add_init_script(_MUTATION_COUNTER_JS)
+    return context
+
+
+async def scrape_with_playwright(url: str, block_resources: bool = BLOCK_RESOURCES) -> dict:
     """
     Scrape with Playwright for JS-rendered content
     Includes click flows, scrolling, and pagination
+    Images, media and fonts are not downloaded unless block_resources is False
+    The host's rate limit is not waited for here; _scrape_website does that
+    before taking a browser slot
     """
     result = {
         "meta": {},
@@ -145,151 +681,126 @@ async def scrape_with_playwright(url: str) -> dict:
         "errors": []
     }
     
-    browser = None
     context = None
     page = None
     
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox'
-                ]
-            )
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                ignore_https_errors=True
+        # Reuse the shared browser and this site's warm context; only the
+        # page is per scrape
+        context = await acquire_context(
+            (urlparse(url).netloc, block_resources),
+            lambda browser: new_scrape_context(browser, block_resources)
+        )
+        
+        page = await context.new_page()
+        
+        # Set longer timeout
+        page.set_default_timeout(45000)  # 45 seconds
+        
+        try:
+            # Navigate to page
+            logger.info("Navigating to %s", url)
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            except Exception as nav_error:
+                error_msg = str(nav_error).lower()
+                if "net::err_aborted" in error_msg or "ns_binding_aborted" in error_msg:
+                    raise Exception("Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.")
+                raise
+            
+            # Wait a bit for initial JS execution, dismissing cookie banners
+            # and overlays meanwhile (it retries for lazy-loaded ones)
+            await asyncio.gather(
+                page.wait_for_timeout(3000),
+                dismiss_overlays(page, result)
             )
             
-            # Add extra headers
-            await context.set_extra_http_headers({
-                'Accept-Language': 'en-US,en;q=0.9',
-            })
+            # Check if page is still alive
+            if page.is_closed():
+                raise Exception("Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.")
             
-            page = await context.new_page()
+            # Try clicking tabs, then "Load more" buttons. Not concurrently:
+            # load-more waits for the page to grow, and the DOM changes from
+            # switching tabs would end that wait early
+            await handle_tabs(page, result)
+            await handle_load_more(page, result)
             
-            # Set longer timeout
-            page.set_default_timeout(45000)  # 45 seconds
+            # Handle scrolling or pagination
+            await handle_scroll_or_pagination(page, result, url)
             
-            try:
-                # Navigate to page
-                logger.info(f"Navigating to {url}")
-                try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                except Exception as nav_error:
-                    error_msg = str(nav_error).lower()
-                    if "net::err_aborted" in error_msg or "ns_binding_aborted" in error_msg:
-                        raise Exception("Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.")
-                    raise
-                
-                # Wait a bit for initial JS execution
-                await page.wait_for_timeout(3000)
-                
-                # Check if page is still alive
-                if page.is_closed():
-                    raise Exception("Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.")
-                
-                # Dismiss cookie banners and overlays
-                await dismiss_overlays(page, result)
+            # Extract final HTML
+            if not page.is_closed():
+                html = await page.content()
+                current_url = page.url
                 
-                # Try clicking tabs
-                await handle_tabs(page, result)
+                # Parse the content
+                result["meta"], result["sections"] = await parse_html(html, current_url)
                 
-                # Try "Load more" buttons
-                await handle_load_more(page, result)
+                logger.info("Successfully scraped %s sections", len(result['sections']))
+            else:
+                raise Exception("Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.")
+            
+        except PlaywrightTimeout as e:
+            logger.error("Timeout during scrape: %s", e)
+            error_msg = str(e).lower()
+            if "navigation" in error_msg or "goto" in error_msg:
+                result["errors"].append({
+                    "message": "Page timed out while loading. This site may be blocking automated access, requires authentication, or is very slow.",
+                    "phase": "navigation"
+                })
+            else:
+                result["errors"].append({
+                    "message": f"Page timed out while loading. The site may be blocking automation or is very slow.",
+                    "phase": "navigation"
+                })
+            # Try to get partial content
+            try:
+                if page and not page.is_closed():
+                    html = await page.content()
+                    result["meta"], result["sections"] = await parse_html(html, url)
+            except Exception as inner_e:
+                logger.error("Failed to get partial content: %s", inner_e)
                 
-                # Handle scrolling or pagination
-                await handle_scroll_or_pagination(page, result, url)
+        except Exception as e:
+            error_msg = str(e)
+            logger.error("Error during Playwright scrape: %s", error_msg, exc_info=True)
+            
+            # Provide more helpful error messages
+            if "closed" in error_msg.lower():
+                result["errors"].append({
+                    "message": "Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.",
+                    "phase": "scraping"
+                })
+            else:
+                result["errors"].append({
+                    "message": error_msg,
+                    "phase": "scraping"
+                })
                 
-                # Extract final HTML
-                if not page.is_closed():
+            # Try to get whatever content we can
+            try:
+                if page and not page.is_closed():
                     html = await page.content()
-                    current_url = page.url
-                    
-                    # Parse the content
-                    parser = HTMLContentParser(html, current_url)
-                    result["meta"] = parser.extract_meta()
-                    result["sections"] = parser.extract_sections()
-                    
-                    logger.info(f"Successfully scraped {len(result['sections'])} sections")
-                else:
-                    raise Exception("Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.")
-                
-            except PlaywrightTimeout as e:
-                logger.error(f"Timeout during scrape: {e}")
-                error_msg = str(e).lower()
-                if "navigation" in error_msg or "goto" in error_msg:
-                    result["errors"].append({
-                        "message": "Page timed out while loading. This site may be blocking automated access, requires authentication, or is very slow.",
-                        "phase": "navigation"
-                    })
-                else:
-                    result["errors"].append({
-                        "message": f"Page timed out while loading. The site may be blocking automation or is very slow.",
-                        "phase": "navigation"
-                    })
-                # Try to get partial content
-                try:
-                    if page and not page.is_closed():
-                        html = await page.content()
-                        parser = HTMLContentParser(html, url)
-                        result["meta"] = parser.extract_meta()
-                        result["sections"] = parser.extract_sections()
-                except Exception as inner_e:
-                    logger.error(f"Failed to get partial content: {inner_e}")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"Error during Playwright scrape: {error_msg}", exc_info=True)
+                    result["meta"], result["sections"] = await parse_html(html, url)
+            except:
+                pass
                 
-                # Provide more helpful error messages
-                if "closed" in error_msg.lower():
-                    result["errors"].append({
-                        "message": "Browser or page closed unexpectedly. This site may be blocking automated access or has protection mechanisms.",
-                        "phase": "scraping"
-                    })
-                else:
-                    result["errors"].append({
-                        "message": error_msg,
-                        "phase": "scraping"
-                    })
-                    
-                # Try to get whatever content we can
-                try:
-                    if page and not page.is_closed():
-                        html = await page.content()
-                        parser = HTMLContentParser(html, url)
-                        result["meta"] = parser.extract_meta()
-                        result["sections"] = parser.extract_sections()
-                except:
-                    pass
-                    
-            finally:
-                # Safely close resources
-                try:
-                    if page and not page.is_closed():
-                        await page.close()
-                except:
-                    pass
-                    
-                try:
-                    if context:
-                        await context.close()
-                except:
-                    pass
-                    
-                try:
-                    if browser:
-                        await browser.close()
-                except:
-                    pass
+        finally:
+            # Safely close resources
+            try:
+                if page and not page.is_closed():
+                    await page.close()
+            except:
+                pass
                 
+            try:
+                if context:
+                    await release_context(context)
+            except:
+                pass
+            
     except Exception as e:
-        logger.error(f"Error initializing Playwright: {e}", exc_info=True)
+        logger.error("Error initializing Playwright: %s", e, exc_info=True)
         result["errors"].append({
             "message": f"Failed to initialize browser: {str(e)}",
             "phase": "initialization"
@@ -298,6 +809,14 @@ async def scrape_with_playwright(url: str) -> dict:
     return result
 
 
+async def block_heavy_resources(route):
+    """Route handler aborting requests the extracted HTML doesn't depend on"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 async def dismiss_overlays(page, result: dict):
     """Dismiss cookie banners and other overlays"""
     overlay_selectors = [
@@ -321,23 +840,27 @@ async def dismiss_overlays(page, result: dict):
         '[data-testid*="cookie" i]'
     ]
     
-    # Try multiple times as overlays can be lazy-loaded
-    for attempt in range(2):
-        for selector in overlay_selectors:
+    # Already dismissed in this site's warm context
+    if overlay_dismissed(page.context):
+        return
+    
+    # Overlays can be lazy-loaded, so give one up to 2 s to appear
+    try:
+        selector = await wait_for_first_visible(page, overlay_selectors, timeout=2000)
+        if selector:
+            overlay = page.locator(SCRAPE_HIT).first
+            await overlay.click(timeout=2000)
+            result["interactions"]["clicks"].append(f"overlay: {selector}")
+            logger.info("Dismissed overlay: %s", selector)
+            mark_overlay_dismissed(page.context)
+            
+            # Give the overlay a moment to go away
             try:
-                button = page.locator(selector).first
-                if await button.count() > 0 and await button.is_visible(timeout=1000):
-                    await button.click(timeout=2000)
-                    result["interactions"]["clicks"].append(f"overlay: {selector}")
-                    await page.wait_for_timeout(1000)
-                    logger.info(f"Dismissed overlay: {selector}")
-                    return  # Exit after first successful dismissal
-            except:
+                await overlay.wait_for(state="hidden", timeout=1000)
+            except PlaywrightTimeout:
                 pass
-        
-        # Wait a bit before trying again
-        if attempt == 0:
-            await page.wait_for_timeout(2000)
+    except:
+        pass
 
 
 async def handle_tabs(page, result: dict):
@@ -349,24 +872,23 @@ async def handle_tabs(page, result: dict):
         '[data-tab]'
     ]
     
-    for selector in tab_selectors:
-        try:
-            tabs = page.locator(selector)
-            count = await tabs.count()
-            
-            if count > 1:
-                logger.info(f"Found {count} tabs with selector: {selector}")
-                # Click first 3 tabs
-                for i in range(min(3, count)):
-                    try:
-                        await tabs.nth(i).click(timeout=3000)
-                        result["interactions"]["clicks"].append(f"tab: {selector}[{i}]")
-                        await page.wait_for_timeout(1000)
-                    except:
-                        pass
-                break
-        except:
-            pass
+    try:
+        found = await page.evaluate(_FIRST_MULTI_JS, tab_selectors)
+    except:
+        return
+    
+    if found:
+        selector, count = found
+        tabs = page.locator(selector)
+        logger.info("Found %s tabs with selector: %s", count, selector)
+        # Click first 3 tabs
+        for i in range(min(3, count)):
+            try:
+                await tabs.nth(i).click(timeout=3000)
+                result["interactions"]["clicks"].append(f"tab: {selector}[{i}]")
+                await page.wait_for_timeout(1000)
+            except:
+                pass
 
 
 async def handle_load_more(page, result: dict):
@@ -383,20 +905,20 @@ async def handle_load_more(page, result: dict):
     max_clicks = 3
     clicks = 0
     
-    for selector in load_more_selectors:
-        while clicks < max_clicks:
-            try:
-                button = page.locator(selector).first
-                if await button.count() > 0 and await button.is_visible():
-                    await button.click(timeout=3000)
-                    result["interactions"]["clicks"].append(f"load-more: {selector}")
-                    clicks += 1
-                    await page.wait_for_timeout(2000)
-                    logger.info(f"Clicked 'Load more' button ({clicks}/{max_clicks})")
-                else:
-                    break
-            except:
+    while clicks < max_clicks:
+        try:
+            size = await page.evaluate(_PAGE_SIZE_JS)
+            selector = await click_first_visible(page, load_more_selectors, timeout=3000)
+            if not selector:
                 break
+            result["interactions"]["clicks"].append(f"load-more: {selector}")
+            clicks += 1
+            
+            # Wait for the new content rather than a fixed 2 s
+            await wait_for_growth(page, size, timeout=2000)
+            logger.info("Clicked 'Load more' button (%s/%s)", clicks, max_clicks)
+        except:
+            break
 
 
 async def handle_scroll_or_pagination(page, result: dict, base_url: str):
@@ -430,29 +952,30 @@ async def handle_pagination(page, result: dict, base_url: str) -> bool:
     pages_visited = 1
     
     for page_num in range(2, max_pages + 1):
-        found_next = False
-        
-        for selector in next_selectors:
-            try:
-                next_link = page.locator(selector).first
-                if await next_link.count() > 0 and await next_link.is_visible():
-                    # Click the next link
-                    await next_link.click(timeout=5000)
-                    await page.wait_for_load_state("networkidle", timeout=10000)
-                    
-                    new_url = page.url
-                    result["interactions"]["pages"].append(new_url)
-                    pages_visited += 1
-                    found_next = True
-                    
-                    logger.info(f"Navigated to page {page_num}: {new_url}")
-                    await page.wait_for_timeout(1000)
-                    break
-            except Exception as e:
-                logger.debug(f"Pagination click failed for {selector}: {e}")
-                continue
-        
-        if not found_next:
+        selector = None
+        try:
+            found = await page.evaluate(_NEXT_LINK_JS, next_selectors)
+            if not found:
+                break
+            
+            selector, href = found
+            if href:
+                # A real link: load it directly, no need to wait for networkidle
+                await wait_for_host(href)
+                await page.goto(href, wait_until="domcontentloaded", timeout=10000)
+            else:
+                # Button-based paginator: click it
+                await page.locator(SCRAPE_HIT).first.click(timeout=5000)
+                await page.wait_for_load_state("networkidle", timeout=10000)
+            
+            new_url = page.url
+            result["interactions"]["pages"].append(new_url)
+            pages_visited += 1
+            
+            logger.info("Navigated to page %s: %s", page_num, new_url)
+            await page.wait_for_timeout(1000)
+        except Exception as e:
+            logger.debug("Pagination via %s failed: %s", selector, e)
             break
     
     return pages_visited > 1
@@ -470,44 +993,30 @@ async def handle_infinite_scroll(page, result: dict):
             if page.is_closed():
                 break
             
-            # Get current content markers (more reliable than just height)
-            previous_height = await page.evaluate("document.body.scrollHeight")
-            previous_content = await page.evaluate("document.body.innerText.length")
-            
-            # Scroll to bottom
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            # Record current content markers (more reliable than just height)
+            # and scroll to bottom in one round-trip
+            previous_size = await page.evaluate(_SCROLL_TO_BOTTOM_JS)
             result["interactions"]["scrolls"] += 1
             
-            # Wait for content to load
-            await page.wait_for_timeout(2500)
+            # Wait for content to load, returning as soon as it lands
+            grew = await wait_for_growth(page, previous_size, timeout=2500)
             
             # Check if page is still alive
             if page.is_closed():
                 break
             
-            # Try to wait for network idle
-            try:
-                await page.wait_for_load_state("networkidle", timeout=4000)
-            except:
-                pass
-            
-            # Check if new content loaded (check both height and content length)
-            if not page.is_closed():
-                new_height = await page.evaluate("document.body.scrollHeight")
-                new_content = await page.evaluate("document.body.innerText.length")
-                
-                height_changed = new_height > previous_height
-                content_changed = new_content > previous_content
-                
-                # If either metric shows change, we got new content
-                if height_changed or content_changed:
-                    consecutive_no_change = 0
-                else:
-                    consecutive_no_change += 1
-                    if consecutive_no_change >= max_no_change:
-                        break
+            # New content (taller page or added nodes) landed within the wait;
+            # let its requests finish before the next scroll
+            if grew:
+                consecutive_no_change = 0
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=4000)
+                except:
+                    pass
             else:
-                break
+                consecutive_no_change += 1
+                if consecutive_no_change >= max_no_change:
+                    break
                 
         except Exception as e:
             break
\ No newline at end of file